@@ -1,39 +1,87 @@
+import importlib
 import logging
+import multiprocessing
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-# Import the actual run functions from each module
-from src.ingestion.ingest_data import main  as ingest_data_run
-from src.preparation.prepare_data import main  as prepare_data_run
-from src.validation.validate_data import main  as validate_data_run
-from src.transformation_and_storage.transform_and_store_data import main as transform_and_store_data_run
-from src.model_building.model_building import main  as model_building_run
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Define pipeline steps as (step_name, function)
-STEPS = [
-    ("INGESTION", ingest_data_run),
-    ("VALIDATION", validate_data_run),
-    ("PREPARATION", prepare_data_run),
-    ("TRANSFORMATION_AND_STORAGE", transform_and_store_data_run),
-    ("MODEL_BUILDING", model_building_run)
-]
+# Define pipeline steps as {step_name: (module_path, dependencies)}; modules are
+# imported only when their step runs, so heavy dependencies load on demand
+STEPS = {
+    "INGESTION": ("src.ingestion.ingest_data", []),
+    "VALIDATION": ("src.validation.validate_data", ["INGESTION"]),
+    "PREPARATION": ("src.preparation.prepare_data", ["VALIDATION"]),
+    "TRANSFORMATION_AND_STORAGE": ("src.transformation_and_storage.transform_and_store_data", ["PREPARATION"]),
+    "MODEL_BUILDING": ("src.model_building.model_building", ["TRANSFORMATION_AND_STORAGE"]),
+}
 
-def run_step(func, step_name):
+def run_step(module_path, step_name):
     logger.info(f"🔹 Starting step: {step_name}")
     try:
-        func()
+        importlib.import_module(module_path).main()
         logger.info(f"✅ Completed step: {step_name}")
     except Exception as e:
         logger.error(f"❌ Error in step {step_name}: {e}", exc_info=True)
         raise
 
+def dag_width(steps):
+    """Largest number of steps that become ready together; 1 means the DAG is a chain."""
+    completed = set()
+    width = 0
+    while len(completed) < len(steps):
+        ready = [name for name, (_, deps) in steps.items() if name not in completed and set(deps) <= completed]
+        if not ready:
+            break
+        width = max(width, len(ready))
+        completed.update(ready)
+    return width
+
+
+def run_dag(steps, executor=None):
+    """Run every step once its dependencies are done; with an executor, independent steps run concurrently."""
+    completed = set()
+    running = {}
+    while len(completed) < len(steps):
+        ready = [
+            step_name for step_name, (_, deps) in steps.items()
+            if step_name not in completed and step_name not in running.values() and set(deps) <= completed
+        ]
+
+        if not ready and not running:
+            pending = set(steps) - completed
+            raise RuntimeError(f"Unresolvable dependencies for steps: {sorted(pending)}")
+
+        if executor is None:
+            for step_name in ready:
+                run_step(steps[step_name][0], step_name)
+                completed.add(step_name)
+            continue
+
+        for step_name in ready:
+            running[executor.submit(run_step, steps[step_name][0], step_name)] = step_name
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            step_name = running.pop(future)
+            future.result()
+            completed.add(step_name)
+
+
 def main():
+    # File logging to logs/pipeline.log, shared with the step modules
+    import src.utils.log_config as log_config
     logger.info("🚀 Starting Customer Churn Pipeline Orchestration")
-    for step_name, func in STEPS:
-        run_step(func, step_name)
+    width = dag_width(STEPS)
+    if width > 1:
+        # One pool for the whole run, only worth starting when steps can actually overlap
+        mp_context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+        max_workers = min(width, os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            run_dag(STEPS, executor)
+    else:
+        run_dag(STEPS)
     logger.info("🎉 Pipeline execution completed successfully")
 
 if __name__ == "__main__":
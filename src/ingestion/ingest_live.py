@@ -1,60 +1,81 @@
 import pandas as pd
-import random
+import numpy as np
 import string
 import os
 import logging
+from collections import namedtuple
 from datetime import datetime
+from functools import lru_cache
 import src.utils.log_config as log_config
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 DATA_PATH = os.path.join(BASE_DIR, "data/Telco-Customer-Churn.csv")
 
+_RNG = np.random.default_rng()
+_ID_ALPHABET = np.frombuffer((string.ascii_uppercase + string.digits).encode(), dtype="S1")
+
+LiveSchema = namedtuple(
+    "LiveSchema",
+    ["columns", "dtypes", "categorical_cols", "numerical_cols", "categorical_values", "numerical_ranges", "is_float"],
+)
+
+@lru_cache(maxsize=1)
 def get_static_df():
     return pd.read_csv(DATA_PATH)
 
-try:
-    static_df = get_static_df()
-    logging.info("[INGESTION] Static data loaded successfully.")
-except Exception as e:
-    logging.error(f"[INGESTION] Live ingestion failed: {e}", exc_info=True)
-    raise  # re-raise so Airflow marks task as failed properly
+@lru_cache(maxsize=1)
+def _get_schema():
+    """Column metadata derived from the static data, computed once per process"""
+    try:
+        static_df = get_static_df()
+        logging.info("[INGESTION] Static data loaded successfully.")
+    except Exception as e:
+        logging.error(f"[INGESTION] Live ingestion failed: {e}", exc_info=True)
+        raise  # re-raise so Airflow marks task as failed properly
 
-categorical_cols = static_df.select_dtypes(include=['object']).columns.tolist()
-numerical_cols = static_df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-categorical_values = {col: static_df[col].dropna().unique().tolist() for col in categorical_cols}
-numerical_ranges = {col: (static_df[col].min(), static_df[col].max()) for col in numerical_cols}
+    categorical_cols = static_df.select_dtypes(include=['object']).columns.tolist()
+    numerical_cols = static_df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    return LiveSchema(
+        columns=static_df.columns.tolist(),
+        dtypes=static_df.dtypes.to_dict(),
+        categorical_cols=categorical_cols,
+        numerical_cols=numerical_cols,
+        categorical_values={col: static_df[col].dropna().unique().tolist() for col in categorical_cols},
+        numerical_ranges={col: (static_df[col].min(), static_df[col].max()) for col in numerical_cols},
+        is_float={col: pd.api.types.is_float_dtype(static_df[col]) for col in numerical_cols},
+    )
 
-def generate_customer_id():
-    """Generate a random live-data customer ID"""
-    suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"LIVE-{suffix}"
+def generate_customer_ids(n):
+    """Generate n random live-data customer IDs"""
+    idx = _RNG.integers(0, len(_ID_ALPHABET), size=(n, 6))
+    suffixes = _ID_ALPHABET[idx].view("S6").ravel().astype(str)
+    return np.char.add("LIVE-", suffixes)
 
 def generate_live_data(n=10):
-    live_rows = []
-    for _ in range(n):
-        row = {}
-        for col in static_df.columns:
-            if col == "customerID":
-                row[col] = generate_customer_id()
-            elif col in categorical_cols:
-                row[col] = random.choice(categorical_values[col])
-            elif col in numerical_cols:
-                min_val, max_val = numerical_ranges[col]
-                if pd.api.types.is_float_dtype(static_df[col]):
-                    row[col] = round(random.uniform(min_val, max_val), 2)
-                else:
-                    row[col] = random.randint(int(min_val), int(max_val))
+    schema = _get_schema()
+    columns = {}
+    for col in schema.columns:
+        if col == "customerID":
+            columns[col] = generate_customer_ids(n)
+        elif col in schema.categorical_cols:
+            columns[col] = _RNG.choice(schema.categorical_values[col], size=n)
+        elif col in schema.numerical_cols:
+            min_val, max_val = schema.numerical_ranges[col]
+            if schema.is_float[col]:
+                columns[col] = np.round(_RNG.uniform(min_val, max_val, size=n), 2)
             else:
-                row[col] = None
-        live_rows.append(row)
+                columns[col] = _RNG.integers(int(min_val), int(max_val) + 1, size=n)
+        else:
+            columns[col] = np.full(n, None, dtype=object)
 
-    df = pd.DataFrame(live_rows)
+    # Column arrays go straight in; cast to the static dtypes so live matches the static schema
+    df = pd.DataFrame(columns, copy=False).astype(schema.dtypes)
 
     today = datetime.now().strftime("%Y-%m-%d")
     raw_dir = f"data/raw/live/"
     os.makedirs(raw_dir, exist_ok=True)
-    filename = os.path.join(raw_dir, f"{datetime.now().strftime('%Y-%m-%d_%H:%M:%S')} live_data.csv")
-    df.to_csv(filename, index=False)
+    filename = os.path.join(raw_dir, f"{datetime.now().strftime('%Y-%m-%d_%H:%M:%S')} live_data.parquet")
+    df.to_parquet(filename, engine="pyarrow", compression="snappy", index=False)
 
     logging.info(f"[INGESTION] Live ingestion successful. Rows: {len(df)}")
     print(f'Live data ingestion complete. Rows: {len(df)}')
@@ -9,7 +9,7 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 
 import src.utils.log_config as log_config
 
-DATA_PATH = "data/raw/combined/master_combined_raw_data.csv"
+DATA_PATH = "data/raw/combined/master_combined_raw_data"
 OUTPUT_CLEAN_DATA = "data/processed/cleaned_data.csv"
 EDA_OUTPUT_DIR = f"reports/eda/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
 
@@ -21,7 +21,8 @@ def load_data(path):
     if not os.path.exists(path):
         logging.error(f"[PREPARATION] File not found: {path}")
         raise FileNotFoundError(f"File not found: {path}")
-    df = pd.read_csv(path)
+    # Master is a partitioned dataset; drop the partition key, it is not a feature
+    df = pd.read_parquet(path).drop(columns=["ingest_date"], errors="ignore")
     logging.info(f"[PREPARATION] Loaded dataset. Shape: {df.shape}")
     return df
 
@@ -1,8 +1,20 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from datetime import datetime
 import os
-import glob
+import csv
+import fnmatch
+import hashlib
+import inspect
+import json
+import pickle
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from joblib import Memory
 
 import src.utils.log_config as log_config
 from src.utils.data_versioning import log_data_version
@@ -16,8 +28,15 @@ DATA_PATH = os.path.join(BASE_PATH, "data", "raw")
 STATIC_RAW_PATH = os.path.join(DATA_PATH, "static")
 LIVE_RAW_PATH = os.path.join(DATA_PATH, "live")
 COMBINED_PATH = os.path.join(DATA_PATH, "combined")
-MASTER_PATH = os.path.join(COMBINED_PATH, "master_combined_raw_data.csv")
+MASTER_PATH = os.path.join(COMBINED_PATH, "master_combined_raw_data")
+MASTER_IDS_PATH = os.path.join(COMBINED_PATH, "master_customer_ids.pkl")
+# Pre-Parquet master CSVs: the one this module used to write, and the repo-root copy read by preparation
+LEGACY_MASTER_PATHS = [
+    os.path.join(COMBINED_PATH, "master_combined_raw_data.csv"),
+    os.path.join(os.path.dirname(BASE_PATH), "data", "raw", "combined", "master_combined_raw_data.csv"),
+]
 REPORT_PATH = os.path.join(BASE_PATH, "data_validation_reports")
+VALIDATION_CACHE_PATH = os.path.join(BASE_PATH, ".cache", "validation")
 
 # Ensure directories exist
 os.makedirs(REPORT_PATH, exist_ok=True)
@@ -49,6 +68,9 @@ EXPECTED_CATEGORIES = {
     "Churn": ["Yes", "No"],
 }
 
+# Probe sets for domain checks, built once instead of per validate() call
+EXPECTED_SETS = {col: frozenset(vals) for col, vals in EXPECTED_CATEGORIES.items()}
+
 EXPECTED_SCHEMA = {
     "customerID": "object",
     "gender": "object",
@@ -73,33 +95,53 @@ EXPECTED_SCHEMA = {
     "Churn": "object",
 }
 
+# Arrow column types matching EXPECTED_SCHEMA, so CSV reads skip type inference
+ARROW_TYPES = {"object": pa.string(), "int64": pa.int64(), "float64": pa.float64()}
+ARROW_SCHEMA = {col: ARROW_TYPES[dtype] for col, dtype in EXPECTED_SCHEMA.items()}
+
 EXPECTED_RANGES = {
     "tenure": (0, 100),
     "MonthlyCharges": (0, 1000),
     "TotalCharges": (0, 100000),
 }
 
+# Master is a Parquet dataset partitioned by ingestion date; each append adds one file
+PARTITION_COL = "ingest_date"
+
 # ------------------- FUNCTIONS -------------------
-def validate(df: pd.DataFrame) -> pd.DataFrame:
-    report = []
+REPORT_COLUMNS = ["Check", "Status", "Details"]
 
-    # Data type checks
-    for col, expected_type in EXPECTED_SCHEMA.items():
-        if col in df.columns:
-            actual_type = str(df[col].dtype)
-            status = "Pass" if actual_type == expected_type else "Fail"
-            details = f"{col} type {actual_type}, expected {expected_type}" if status=="Fail" else f"{col} type {actual_type} is correct"
-            report.append((f"Type - {col}", status, details))
-        else:
-            report.append((f"Type - {col}", "Fail", "Missing column"))
 
-    # Missing values
-    for col, cnt in df.isnull().sum().items():
-        status = "Pass" if cnt == 0 else "Fail"
-        details = "No missing values" if status=="Pass" else f"{cnt} missing values"
-        report.append((f"Missing - {col}", status, details))
+def report_section(check, status, details) -> pd.DataFrame:
+    """Build a report section from column-wise arrays of check names, statuses and details"""
+    return pd.DataFrame({"Check": check, "Status": status, "Details": details}, columns=REPORT_COLUMNS)
+
+
+def check_types(df: pd.DataFrame) -> pd.DataFrame:
+    expected = pd.Series(EXPECTED_SCHEMA)
+    actual = df.dtypes.astype(str).reindex(expected.index)
+    ok = (actual == expected).to_numpy()
+    details = np.where(
+        actual.isna(),
+        "Missing column",
+        np.where(ok, expected.index + " type " + actual + " is correct",
+                 expected.index + " type " + actual + ", expected " + expected),
+    )
+    return report_section("Type - " + expected.index, np.where(ok, "Pass", "Fail"), details)
+
 
-    # Integrity checks
+def check_missing(df: pd.DataFrame) -> pd.DataFrame:
+    miss = df.isnull().sum()
+    ok = (miss == 0).to_numpy()
+    return report_section(
+        "Missing - " + miss.index.astype(str),
+        np.where(ok, "Pass", "Fail"),
+        np.where(ok, "No missing values", miss.astype(str) + " missing values"),
+    )
+
+
+def check_integrity(df: pd.DataFrame) -> pd.DataFrame:
+    report = []
     if df["customerID"].isnull().any():
         report.append(("Integrity - Null ID", "Fail", "Null customerID found"))
     else:
@@ -109,64 +151,230 @@ def validate(df: pd.DataFrame) -> pd.DataFrame:
         report.append(("Integrity - Duplicates", "Fail", "Duplicate customerID found"))
     else:
         report.append(("Integrity - Duplicates", "Pass", "No duplicate customerIDs"))
-
-    # Range checks
-    for col, (low, high) in EXPECTED_RANGES.items():
-        if col in df.columns:
-            below = (df[col] < low).sum()
-            above = (df[col] > high).sum()
-            status = "Pass" if below==0 and above==0 else "Fail"
-            details = f"{below} below {low}, {above} above {high}" if status=="Fail" else f"All values within {low}-{high}"
-            report.append((f"Range - {col}", status, details))
-
-    # Categorical domain checks
-    for col, expected_vals in EXPECTED_CATEGORIES.items():
+    return pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+def check_ranges(df: pd.DataFrame) -> pd.DataFrame:
+    bounds = pd.DataFrame(EXPECTED_RANGES, index=["low", "high"]).T
+    bounds = bounds[bounds.index.isin(df.columns)]
+    # Per column, so each array is read in its own dtype without a combined copy
+    values = {col: df[col].to_numpy() for col in bounds.index}
+    below = pd.Series({col: np.count_nonzero(values[col] < bounds.at[col, "low"]) for col in bounds.index}, dtype="int64")
+    above = pd.Series({col: np.count_nonzero(values[col] > bounds.at[col, "high"]) for col in bounds.index}, dtype="int64")
+    ok = ((below == 0) & (above == 0)).to_numpy()
+    low, high = bounds["low"].astype(str), bounds["high"].astype(str)
+    details = np.where(
+        ok,
+        "All values within " + low + "-" + high,
+        below.astype(str) + " below " + low + ", " + above.astype(str) + " above " + high,
+    )
+    return report_section("Range - " + bounds.index, np.where(ok, "Pass", "Fail"), details)
+
+
+def check_domains(df: pd.DataFrame) -> pd.DataFrame:
+    report = []
+    for col, expected_vals in EXPECTED_SETS.items():
         if col in df.columns:
-            invalid_vals = set(df[col].dropna().unique()) - set(expected_vals)
+            values = df[col]
+            invalid_vals = set(values[~values.isin(expected_vals) & values.notna()].unique())
             status = "Fail" if invalid_vals else "Pass"
             details = f"Invalid values: {invalid_vals}" if status=="Fail" else "All values valid"
             report.append((f"Domain - {col}", status, details))
         else:
             report.append((f"Domain - {col}", "Fail", "Column missing"))
+    return pd.DataFrame(report, columns=REPORT_COLUMNS)
 
-    return pd.DataFrame(report, columns=["Check", "Status", "Details"])
 
+# Independent checks over the same frame; run concurrently, report keeps this order
+CHECKS = [check_types, check_missing, check_integrity, check_ranges, check_domains]
 
-def get_latest_file(folder: str, pattern: str) -> str:
-    files = glob.glob(os.path.join(folder, pattern))
-    if not files:
+
+def validate(df: pd.DataFrame) -> pd.DataFrame:
+    with ThreadPoolExecutor(max_workers=len(CHECKS)) as executor:
+        sections = list(executor.map(lambda check: check(df), CHECKS))
+
+    return pd.concat(sections, ignore_index=True)
+
+
+validation_cache = Memory(location=VALIDATION_CACHE_PATH, compress=3, verbose=0)
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def config_fingerprint() -> str:
+    """Hash of the expected values and the source of every check; part of every cached report's key"""
+    sources = [inspect.getsource(func) for func in [*CHECKS, report_section, validate]]
+    config = [EXPECTED_SCHEMA, EXPECTED_RANGES, EXPECTED_CATEGORIES, sources]
+    return hashlib.blake2b(json.dumps(config, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+# Keyed on the file's content hash and the validation config, not on the frame itself,
+# so identical batches re-use the report and config changes never serve stale results
+@validation_cache.cache(ignore=["df"])
+def validate_cached(df: pd.DataFrame, content_hash: str, config_hash: str) -> pd.DataFrame:
+    return validate(df)
+
+
+@lru_cache(maxsize=32)
+def _latest_file(folder: str, pattern: str, folder_mtime_ns: int) -> str:
+    with os.scandir(folder) as it:
+        entries = [(e.stat().st_ctime, e.path) for e in it if e.is_file() and fnmatch.fnmatch(e.name, pattern)]
+    if not entries:
         raise FileNotFoundError(f"No files found in {folder} matching {pattern}")
-    return max(files, key=os.path.getctime)
+    return max(entries)[1]
+
+
+def get_latest_file(folder: str, pattern: str) -> str:
+    # Folder mtime is part of the cache key, so adding or removing a batch invalidates it
+    try:
+        folder_mtime_ns = os.stat(folder).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No files found in {folder} matching {pattern}") from None
+    return _latest_file(folder, pattern, folder_mtime_ns)
+
+
+def read_csv(path: str) -> pd.DataFrame:
+    """Parse a raw CSV with Arrow's multithreaded reader, loading only the expected columns and types"""
+    # Project to expected columns present in the file, so absent ones still report as missing
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types=ARROW_SCHEMA,
+            # Blank string cells become nulls, as with pd.read_csv, so missing/integrity checks see them
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=True,
+            include_columns=[col for col in ARROW_SCHEMA if col in header],
+        ),
+    )
+    return table.to_pandas()
+
+
+def save_report(report_df: pd.DataFrame, filename: str):
+    pacsv.write_csv(pa.Table.from_pandas(report_df, preserve_index=False), filename)
+
+
+def load_master(columns=None) -> pd.DataFrame:
+    return pd.read_parquet(MASTER_PATH, columns=columns)
+
+
+def append_to_master(df: pd.DataFrame):
+    df = df.assign(**{PARTITION_COL: datetime.now().strftime("%Y-%m-%d")})
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        root_path=MASTER_PATH,
+        partition_cols=[PARTITION_COL],
+    )
+
+
+def master_mtime() -> float:
+    """Modification time of the newest file in the master dataset"""
+    return max(
+        os.path.getmtime(os.path.join(root, name))
+        for root, _, files in os.walk(MASTER_PATH)
+        for name in files
+    )
+
+
+def load_master_ids() -> set:
+    """Known master customerIDs; rebuilt from the master if the index is missing or
+    older than the newest master file (e.g. a run died between the two writes)"""
+    if os.path.exists(MASTER_IDS_PATH) and os.path.getmtime(MASTER_IDS_PATH) >= master_mtime():
+        with open(MASTER_IDS_PATH, "rb") as f:
+            return pickle.load(f)
+    logging.info("[VALIDATION] customerID index missing or stale. Rebuilding from master...")
+    return set(load_master(columns=["customerID"])["customerID"])
+
+
+def save_master_ids(ids: set):
+    """Write after the master append, via a temp file so a crash never leaves a partial index"""
+    tmp_path = f"{MASTER_IDS_PATH}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(ids, f)
+    os.replace(tmp_path, MASTER_IDS_PATH)
+
+
+def check_master_duplicates(live_df: pd.DataFrame, master_ids: set) -> pd.DataFrame:
+    """Only duplicate IDs need master state; every other check is row-local to the live batch"""
+    clashes = set(live_df["customerID"]) & master_ids
+    if clashes:
+        report = [("Integrity - Master Duplicates", "Fail", f"{len(clashes)} customerIDs already in master")]
+    else:
+        report = [("Integrity - Master Duplicates", "Pass", "No customerIDs already in master")]
+    return pd.DataFrame(report, columns=REPORT_COLUMNS)
+
+
+def migrate_legacy_master() -> bool:
+    """One-time import of a legacy CSV master as the initial dataset partition; True if migrated"""
+    legacy_path = next((path for path in LEGACY_MASTER_PATHS if os.path.exists(path)), None)
+    if legacy_path is None:
+        return False
+
+    logging.info(f"[VALIDATION] Migrating legacy master CSV to Parquet dataset: {legacy_path}")
+    legacy_df = read_csv(legacy_path)
+    append_to_master(legacy_df)
+    save_master_ids(set(legacy_df["customerID"]))
+    logging.info(f"[VALIDATION] Legacy master migrated. Rows: {len(legacy_df)}")
+    log_data_version(
+        dataset_name="master_combined_raw_data",
+        file_path=MASTER_PATH,
+        source=legacy_path,
+        changelog="Migrated legacy CSV master to partitioned Parquet dataset"
+    )
+    return True
 
 
 # ------------------- MAIN -------------------
 def main():
 
+    if not os.path.exists(MASTER_PATH):
+        migrate_legacy_master()
+
     if not os.path.exists(MASTER_PATH):
         logging.info("[VALIDATION] Master raw data not found. Creating fresh master raw data...")
 
         static_file = get_latest_file(STATIC_RAW_PATH, "*static_data.csv")
         logging.info(f"[VALIDATION] Using latest static data: {static_file}")
-        static_df = pd.read_csv(static_file)
+        try:
+            static_df = read_csv(static_file)
+        except pa.ArrowInvalid as e:
+            report_df = pd.DataFrame(
+                [("Read - Static data", "Fail", f"Could not parse with expected types: {e}")],
+                columns=REPORT_COLUMNS,
+            )
+            filename = os.path.join(REPORT_PATH, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_validation_report_combined.csv")
+            save_report(report_df, filename)
+            logging.info(f"[VALIDATION] Report saved at: {filename}")
+            logging.error("[VALIDATION] Validation failed. Master not created.")
+            return
 
-        live_file = get_latest_file(LIVE_RAW_PATH, "*live_data.csv")
+        live_file = get_latest_file(LIVE_RAW_PATH, "*live_data.parquet")
         logging.info(f"[VALIDATION] Using latest live data: {live_file}")
-        live_df = pd.read_csv(live_file)
+        live_df = pd.read_parquet(live_file)
 
         combined_df = pd.concat([static_df, live_df])
         report_df = validate(combined_df)
 
         filename = os.path.join(REPORT_PATH, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_validation_report_combined.csv")
-        report_df.to_csv(filename, index=False)
+        save_report(report_df, filename)
         logging.info(f"[VALIDATION] Report saved at: {filename}")
 
         if (report_df["Status"] == "Fail").any():
             logging.error("[VALIDATION] Validation failed. Master not created.")
         else:
-            combined_df.to_csv(MASTER_PATH, index=False)
+            append_to_master(combined_df)
+            save_master_ids(set(combined_df["customerID"]))
             logging.info(f"[VALIDATION] Master dataset saved at: {MASTER_PATH}")
             log_data_version(
-                dataset_name="master_combined_raw_data.csv",
+                dataset_name="master_combined_raw_data",
                 file_path=MASTER_PATH,
                 source="static data, live data",
                 changelog="Created master data with static + live"
@@ -174,35 +382,36 @@ def main():
 
     else:
         logging.info("[VALIDATION] Master data found. Appending new live data...")
-        master_df = pd.read_csv(MASTER_PATH)
+        master_ids = load_master_ids()
 
-        live_file = get_latest_file(LIVE_RAW_PATH, "*live_data.csv")
+        live_file = get_latest_file(LIVE_RAW_PATH, "*live_data.parquet")
         logging.info(f"[VALIDATION] Using latest live data: {live_file}")
-        live_df = pd.read_csv(live_file)
+        live_df = pd.read_parquet(live_file)
 
         # Validate live data first
-        live_report = validate(live_df)
+        live_report = validate_cached(live_df, file_hash(live_file), config_fingerprint())
         filename = os.path.join(REPORT_PATH, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_validation_report_live.csv")
-        live_report.to_csv(filename, index=False)
+        save_report(live_report, filename)
         logging.info(f"[VALIDATION] Live data report saved at: {filename}")
 
         if (live_report["Status"] == "Fail").any():
             logging.error("[VALIDATION] Live data validation failed. Skipping update.")
             return
 
-        new_master = pd.concat([master_df, live_df])
-        combined_report = validate(new_master)
+        combined_report = check_master_duplicates(live_df, master_ids)
         filename = os.path.join(REPORT_PATH, f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_validation_report_combined.csv")
-        combined_report.to_csv(filename, index=False)
+        save_report(combined_report, filename)
         logging.info(f"[VALIDATION] Updated master validation report saved at: {filename}")
 
         if (combined_report["Status"] == "Fail").any():
             logging.error("[VALIDATION] Combined data invalid. Master not updated.")
         else:
-            new_master.to_csv(MASTER_PATH, index=False)
-            logging.info(f"[VALIDATION] Master dataset updated. Rows: {len(new_master)}")
+            append_to_master(live_df)
+            master_ids.update(live_df["customerID"])
+            save_master_ids(master_ids)
+            logging.info(f"[VALIDATION] Master dataset updated. Rows appended: {len(live_df)}")
             log_data_version(
-                dataset_name="master_combined_raw_data.csv",
+                dataset_name="master_combined_raw_data",
                 file_path=MASTER_PATH,
                 source="static data, live data",
                 changelog="Updated master with new live data"